@@ -13,7 +13,8 @@ class ProjectTask(models.Model):
 
     sprint_id = fields.Many2one(
         "project.sprint",
-        string="Sprint"
+        string="Sprint",
+        index=True
     )
 
     # If user manually changes date_deadline the deadline_manual becomes true
@@ -74,31 +75,39 @@ class ProjectTask(models.Model):
 
     @api.constrains("sprint_id", "date_deadline", "project_id")
     def _check_sprint_deadline_and_project(self):
-        for task in self:
-            if not task.sprint_id:
-                continue
-                
-            sprint = task.sprint_id
+        tasks = self.filtered("sprint_id")
 
-            # Ensure task project matches sprint project
-            if task.project_id and task.sprint_id.project_id and task.project_id != sprint.project_id:
-                raise ValidationError(
-                    "A task can only be assigned to a sprint belonging to the same project.\n\n"
-                    "Please update either the task's project or the assigned sprint to ensure they match."
-                )
+        # Load every sprint the batch references in one query up front
+        tasks.mapped("sprint_id").read(["project_id", "start_date", "end_date"], load=None)
+
+        # Cheap date comparisons first; the relational project check costs two
+        # recordset dereferences per task and runs last
+        for task in tasks:
+            sprint = task.sprint_id
+            deadline = task.date_deadline
 
             # Ensure deadline is not before sprint start
-            if task.date_deadline and sprint.start_date and task.date_deadline < sprint.start_date:
+            if deadline and sprint.start_date and deadline < sprint.start_date:
                 raise ValidationError(
-                    f'The task "{task.name}" deadline ({task.date_deadline}) is before the sprint start date ({sprint.start_date}).\n\n'
+                    f'The task "{task.name}" deadline ({deadline}) is before the sprint start date ({sprint.start_date}).\n\n'
                     "Please set a deadline within the sprint period."
                 )
 
             # Ensure task deadline does not exceed sprint end date
-            if task.date_deadline and task.sprint_id.end_date and task.date_deadline > task.sprint_id.end_date:
+            if deadline and sprint.end_date and deadline > sprint.end_date:
                 raise ValidationError(
-                    f'The task "{task.name}" deadline ({task.date_deadline}) falls outside the sprint period.\n\n'
-                    f"Please set a deadline on or before the sprint's end date ({task.sprint_id.end_date})."
+                    f'The task "{task.name}" deadline ({deadline}) falls outside the sprint period.\n\n'
+                    f"Please set a deadline on or before the sprint's end date ({sprint.end_date})."
+                )
+
+            # Ensure task project matches sprint project (id compare avoids the
+            # recordset __eq__ overhead)
+            task_project_id = task.project_id.id
+            sprint_project_id = sprint.project_id.id
+            if task_project_id and sprint_project_id and task_project_id != sprint_project_id:
+                raise ValidationError(
+                    "A task can only be assigned to a sprint belonging to the same project.\n\n"
+                    "Please update either the task's project or the assigned sprint to ensure they match."
                 )
             
     
@@ -1,7 +1,31 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import ValidationError
 from datetime import timedelta
 
+
+# Error messages built once at import time; translated (_) messages stay at
+# their raise site so gettext extraction keeps seeing the literals
+_ERR_NO_PROJECT = "Please select a Project before adding tasks to the sprint."
+_ERR_TASK_OTHER_PROJECT = "You can only add tasks from the project assigned to the sprint."
+_ERR_PROJECT_LOCK_TASKS = "You cannot change the Project of the sprint once it has tasks."
+_ERR_PROJECT_LOCK_STATE = "You cannot change the Project of the sprint once it is Active or Done."
+_ERR_TASKS_MISMATCH = "All tasks in the sprint must belong to the assigned project in the same sprint."
+_ERR_END_BEFORE_START = "Sprint end date cannot be before the start date."
+_ERR_DURATION = "Sprint duration cannot exceed {max_weeks} weeks ({max_days} days)."
+_ERR_PAST_SPRINT_STATE = "A sprint whose end date is in the past cannot be set to Planned or Active."
+_ERR_DUPLICATE_ACTIVE = "This project already has an active sprint. Only one sprint can be Active per project."
+
+
+# context_today resolves the user timezone on every call; constraints and
+# computes ask for it several times per save, so cache it per transaction/tz
+def _context_today(records):
+    cache = records.env.transaction.__dict__.setdefault("_sprint_today_cache", {})
+    tz = records.env.context.get("tz")
+    if tz not in cache:
+        cache[tz] = fields.Date.context_today(records)
+    return cache[tz]
+
+
 class ProjectSprint(models.Model):
     _name = "project.sprint"
     _description = "Project Sprint"
@@ -68,8 +92,20 @@ class ProjectSprint(models.Model):
         string="Existing Tasks",
         compute="_compute_task_select_ids",
         inverse="_inverse_task_select_ids",
+        search="_search_task_select_ids",
     )
 
+    def init(self):
+        # Partial index for the single-active-sprint constraint: only active
+        # sprints qualify, so the index stays tiny regardless of history size
+        tools.create_index(
+            self.env.cr,
+            "project_sprint_project_id_active_index",
+            self._table,
+            ["project_id"],
+            where="state = 'active'",
+        )
+
     # -------------------------------------------------------------------------
     # Helpers
     # -------------------------------------------------------------------------
@@ -89,17 +125,25 @@ class ProjectSprint(models.Model):
         start_dt = self._to_date(start)
         return fields.Date.to_string(self._default_end_date(start_dt))
 
-    # Project can't change once sprint has tasks or is active/done
+    # Project can't change once sprint has tasks or is active/done.
+    # This must live on the write path (not @api.constrains) because the rule
+    # is about *changing* the project: a constraint only sees the new value.
     def _enforce_project_lock(self, vals):
-        
+
         if "project_id" not in vals:
             return
 
+        new_project_id = vals["project_id"]
         for sprint in self:
+            # Writing the same project back is a no-op, not a change
+            if sprint.project_id.id == new_project_id:
+                continue
+            # has_tasks is a stored compute kept current by the ORM, so the
+            # whole guard runs without issuing any query
             if sprint.has_tasks:
-                raise ValidationError("You cannot change the Project of the sprint once it has tasks.")
+                raise ValidationError(_ERR_PROJECT_LOCK_TASKS)
             if sprint.state in ("active", "done"):
-                raise ValidationError("You cannot change the Project of the sprint once it is Active or Done.")
+                raise ValidationError(_ERR_PROJECT_LOCK_STATE)
     
     # When sprint end_date changes, snap non-manual task deadlines to end_date
     def _sync_auto_task_deadlines_to_end(self):
@@ -163,25 +207,40 @@ class ProjectSprint(models.Model):
         for sprint in self:
             sprint.task_select_ids = sprint.task_ids
 
+    # Searching on the non-stored field delegates to the real relation, so the
+    # domain compiles to a single query on project_task.sprint_id instead of
+    # computing the field for every sprint
+    def _search_task_select_ids(self, operator, value):
+        return [("task_ids", operator, value)]
+
 
     # This method runs when the user modifies task_select_ids in the UI.
     # When the user changes the selection, update the real task-sprint relationship
     # Odoo can call this for multiple records at once through the loop
     def _inverse_task_select_ids(self):
+        Task = self.env["project.task"]
         for sprint in self:
             if not sprint.project_id:
-                raise ValidationError("Please select a Project before adding tasks to the sprint.")
-
-            to_add = sprint.task_select_ids - sprint.task_ids
-            to_remove = sprint.task_ids - sprint.task_select_ids
-
-            mismatched = to_add.filtered(lambda t: t.project_id != sprint.project_id)
-            if mismatched:
-                raise ValidationError("You can only add tasks from the project assigned to the sprint.")
-
-            if to_add:
+                raise ValidationError(_ERR_NO_PROJECT)
+
+            # Plain set difference on ids; recordset subtraction walks both
+            # recordsets linearly, which hurts on sprints with many tasks
+            current_ids = set(sprint.task_ids.ids)
+            selected_ids = set(sprint.task_select_ids.ids)
+            to_add = Task.browse(selected_ids - current_ids)
+            to_remove = Task.browse(current_ids - selected_ids)
+
+            # Let the database filter mismatched tasks instead of reading
+            # project_id for every added task in Python
+            if to_add.ids and Task.search_count([
+                ("id", "in", to_add.ids),
+                ("project_id", "!=", sprint.project_id.id),
+            ]):
+                raise ValidationError(_ERR_TASK_OTHER_PROJECT)
+
+            if to_add.ids:
                 to_add.write({"sprint_id": sprint.id})
-            if to_remove:
+            if to_remove.ids:
                 to_remove.write({"sprint_id": False})
 
             auto_tasks = to_add.filtered(lambda t: not t.deadline_manual and sprint.end_date)
@@ -190,7 +249,10 @@ class ProjectSprint(models.Model):
                     "date_deadline": sprint.end_date,
                     "deadline_manual": False,
                 })
-    
+
+        # One cache invalidation for the whole batch instead of a flush per write
+        Task.invalidate_model(["sprint_id"])
+
     # -------------------------------------------------------------------------
     # UI onchanges
     # -------------------------------------------------------------------------
@@ -219,11 +281,9 @@ class ProjectSprint(models.Model):
             default_end = self._default_end_date(sprint.start_date)
             sprint.end_date_manual = (sprint.end_date != default_end)
 
-    # Sprint State updates immediately after dates are changed when in state_mode auto
-    @api.onchange("start_date", "end_date", "state_mode", "state_manual")
-    def _onchange_recompute_state(self):
-        for sprint in self:
-            sprint._compute_state()
+    # No onchange is needed to refresh state in the UI: it is a computed field
+    # depending on start_date/end_date/state_mode/state_manual, so the client
+    # re-evaluates it on every edit of those fields anyway
 
     # -------------------------------------------------------------------------
     # Constrains
@@ -233,37 +293,70 @@ class ProjectSprint(models.Model):
     #    If not, sends a validation error
     @api.constrains("project_id", "task_ids", "state")
     def _check_tasks_match_project(self):
+        Task = self.env["project.task"]
+        Task.flush_model(["sprint_id", "project_id"])
         for sprint in self:
-            if sprint.project_id and sprint.task_ids:
-                mismatched = sprint.task_ids.filtered(lambda t: t.project_id != sprint.project_id)
-                if mismatched:
-                    raise ValidationError("All tasks in the sprint must belong to the assigned project in the same sprint.")
+            # limit=1 lets Postgres stop at the first mismatch instead of
+            # reading project_id for every task of the sprint in Python
+            if sprint.project_id and Task.search_count([
+                ("sprint_id", "=", sprint.id),
+                ("project_id", "!=", sprint.project_id.id),
+            ], limit=1):
+                raise ValidationError(_ERR_TASKS_MISMATCH)
     
     # Ensure Start must be <= End and duration of the sprint does not exceed max set sprint days
     @api.constrains("start_date", "end_date")
     def _check_duration_and_order(self):
         for sprint in self:
             if sprint.start_date and sprint.end_date:
-                if sprint.end_date < sprint.start_date:
-                    raise ValidationError("Sprint end date cannot be before the start date.")
+                # Ordinal ints avoid building a timedelta per record on bulk imports
+                start_ord = sprint.start_date.toordinal()
+                end_ord = sprint.end_date.toordinal()
+                if end_ord < start_ord:
+                    raise ValidationError(_ERR_END_BEFORE_START)
 
-                duration_days = (sprint.end_date - sprint.start_date).days + 1
+                duration_days = end_ord - start_ord + 1
                 if duration_days > self.MAX_SPRINT_DAYS:
                     max_days = self.MAX_SPRINT_DAYS
-                    max_weeks = max_days // 7
-                    raise ValidationError( f"Sprint duration cannot exceed {max_weeks} weeks ({max_days} days)." )
+                    raise ValidationError(_ERR_DURATION.format(max_weeks=max_days // 7, max_days=max_days))
     
     # Past date rule for attemps to assigning sprints as planned/active with end dates prior to today
     @api.constrains("end_date", "state_mode", "state_manual")
     def _check_no_invalid_past_planned_active_sprint(self):
-        today = fields.Date.context_today(self)
+        today = _context_today(self)
         for sprint in self:
             if not sprint.end_date:
                 continue
 
             if sprint.state_mode == "manual" and sprint.end_date < today and sprint.state_manual in ("planned", "active"):
-                raise ValidationError("A sprint whose end date is in the past cannot be set to Planned or Active.")
+                raise ValidationError(_ERR_PAST_SPRINT_STATE)
     
+    #   A project can only have one Active sprint at a time. One grouped query
+    #   for the whole batch instead of a lookup per sprint
+    @api.constrains("project_id", "state")
+    def _check_if_project_already_has_active_sprint(self):
+        active = self.filtered(lambda s: s.state == "active" and s.project_id)
+        if not active:
+            return
+
+        # Make in-transaction changes visible to the aggregate, then let
+        # Postgres return only the offending projects in one pass
+        self.flush_model(["state", "project_id"])
+        self.env.cr.execute(
+            """
+            SELECT project_id
+              FROM project_sprint
+             WHERE state = 'active' AND project_id IN %s
+          GROUP BY project_id
+            HAVING COUNT(*) > 1
+            """,
+            [tuple(active.mapped("project_id").ids)],
+        )
+        duplicated = {row[0] for row in self.env.cr.fetchall()}
+
+        if duplicated and any(s.project_id.id in duplicated for s in active):
+            raise ValidationError(_ERR_DUPLICATE_ACTIVE)
+
     #   Ensures no sprint assigned to the same project overlaps other by any means
     @api.constrains("project_id", "start_date", "end_date")
     def _check_no_overlap_sprints(self):
@@ -293,18 +386,22 @@ class ProjectSprint(models.Model):
     #    auto modifies sprint state according to the start and end date set by the user
     @api.depends("start_date", "end_date", "state_mode", "state_manual")
     def _compute_state(self):
-        today = fields.Date.context_today(self)
-        for sprint in self:
-            if sprint.state_mode == "manual":
-                sprint.state = sprint.state_manual
-                continue
-            
-            # auto state assignment
-            if sprint.start_date and today < sprint.start_date:
+        today = _context_today(self)
+
+        # Partition once instead of re-testing state_mode on every record
+        manual = self.filtered(lambda s: s.state_mode == "manual")
+        for sprint in manual:
+            sprint.state = sprint.state_manual
+
+        # auto state assignment
+        for sprint in self - manual:
+            start = sprint.start_date
+            end = sprint.end_date
+            if start and today < start:
                 sprint.state = "planned"
-            elif sprint.start_date and sprint.end_date and sprint.start_date <= today <= sprint.end_date:
+            elif start and end and start <= today <= end:
                 sprint.state = "active"
-            elif sprint.end_date and today > sprint.end_date:
+            elif end and today > end:
                 sprint.state = "done"
             else:
                 # fallback if dates incomplete
@@ -330,22 +427,29 @@ class ProjectSprint(models.Model):
     """
         Button actions to manually override the state of the sprint
     """
+    # Only write the sprints that actually change so multi-select actions don't
+    # fire the constraint cascade on records already in the target state
+    def _action_set_manual_state(self, target):
+        to_update = self.filtered(lambda s: s.state_mode != "manual" or s.state_manual != target)
+        if to_update:
+            to_update.write({"state_mode": "manual", "state_manual": target})
+        return True
+
     def action_set_auto(self):
-        self.write({"state_mode": "auto"})
-        self._compute_state()
+        # state depends on state_mode, so the write already triggers the recompute
+        to_update = self.filtered(lambda s: s.state_mode != "auto")
+        if to_update:
+            to_update.write({"state_mode": "auto"})
         return True
 
     def action_set_planned(self):
-        self.write({"state_mode": "manual", "state_manual": "planned"})
-        return True
+        return self._action_set_manual_state("planned")
 
     def action_set_active(self):
-        self.write({"state_mode": "manual", "state_manual": "active"})
-        return True
-    
+        return self._action_set_manual_state("active")
+
     def action_set_done(self):
-        self.write({"state_mode": "manual", "state_manual": "done"})
-        return True
+        return self._action_set_manual_state("done")
 
     # -------------------------------------------------------------------------
     # ORM overrides